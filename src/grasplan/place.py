@@ -12,7 +12,8 @@ import actionlib
 import moveit_commander
 import traceback
 
-from grasplan.tools.support_plane_tools import obj_to_plane, adjust_plane, gen_place_poses_from_plane, make_plane_marker_msg
+from grasplan.tools.support_plane_tools import obj_to_plane, adjust_plane, gen_place_poses_from_plane, make_plane_marker_msg, \
+                                              cached_scene_objects
 from grasplan.tools.common import separate_object_class_from_id
 from grasplan.tools.moveit_errors import print_moveit_error
 from std_srvs.srv import Empty, SetBool, Trigger
@@ -197,20 +198,22 @@ class PlaceTools():
         action_client = actionlib.SimpleActionClient(self.place_object_server_name, PlaceAction)
         rospy.loginfo(f'sending place goal to {self.place_object_server_name} action server')
 
-        # generate plane from object surface
-        plane = obj_to_plane(support_object, self.scene)
+        # query the support object only once from the planning scene
+        with cached_scene_objects(self.scene):
+            # generate plane from object surface
+            plane = obj_to_plane(support_object, self.scene)
 
-        # scale down plane to account for obj width and length
-        plane = adjust_plane(plane, 0.05)
+            # scale down plane to account for obj width and length
+            plane = adjust_plane(plane, 0.05)
 
-        # publish plane as marker for visualisation purposes
-        self.plane_vis_pub.publish(make_plane_marker_msg(self.global_reference_frame, plane))
-        
-        # generate random places within the plane
-        object_class_tbp = separate_object_class_from_id(object_to_be_placed)[0]
-        place_poses_as_object_list_msg = gen_place_poses_from_plane(object_class_tbp, support_object, plane, self.scene, \
-                frame_id=self.global_reference_frame, number_of_poses=number_of_poses, \
-                min_dist=self.min_dist, ignore_min_dist_list=self.ignore_min_dist_list)
+            # publish plane as marker for visualisation purposes
+            self.plane_vis_pub.publish(make_plane_marker_msg(self.global_reference_frame, plane))
+
+            # generate random places within the plane
+            object_class_tbp = separate_object_class_from_id(object_to_be_placed)[0]
+            place_poses_as_object_list_msg = gen_place_poses_from_plane(object_class_tbp, support_object, plane, self.scene, \
+                    frame_id=self.global_reference_frame, number_of_poses=number_of_poses, \
+                    min_dist=self.min_dist, ignore_min_dist_list=self.ignore_min_dist_list)
 
         self.place_poses_pub.publish(place_poses_as_object_list_msg)
 
@@ -1,48 +1,71 @@
 #!/usr/bin/env python3
 
-import tf
-import copy
 import numpy as np
+from scipy.spatial.transform import Rotation
 from geometry_msgs.msg import Pose, PoseArray
 
+def make_pose_msg(position, orientation):
+    '''
+    build a geometry_msgs/Pose from a position (x, y, z) and a quaternion (x, y, z, w)
+    '''
+    pose_msg = Pose()
+    pose_msg.position.x, pose_msg.position.y, pose_msg.position.z = position
+    pose_msg.orientation.x, pose_msg.orientation.y, pose_msg.orientation.z, pose_msg.orientation.w = orientation
+    return pose_msg
+
+def poses_to_arrays(poses):
+    '''
+    input: list of geometry_msgs/Pose
+    output: positions as (N, 3) array and orientations as (N, 4) array
+    '''
+    positions = np.array([[p.position.x, p.position.y, p.position.z] for p in poses], dtype=np.float64).reshape(-1, 3)
+    orientations = np.array([[p.orientation.x, p.orientation.y, p.orientation.z, p.orientation.w] for p in poses],\
+                            dtype=np.float64).reshape(-1, 4)
+    return positions, orientations
+
 class GraspEditorState:
     def __init__(self):
-        self.__grasps = None
+        self.__positions = None
+        self.__orientations = None
         self.__selected_grasp_index = None
 
-    def set_grasps(self, grasps):
-        assert isinstance(grasps, list)
-        if len(grasps) == 0:
-            self.__grasps = []
-        else:
-            assert isinstance(grasps[0], Pose)
-            self.__grasps = copy.deepcopy(grasps) # deepcopy is essential here!
+    def set_grasps(self, positions, orientations):
+        assert isinstance(positions, np.ndarray) and positions.shape[1] == 3
+        assert isinstance(orientations, np.ndarray) and orientations.shape[1] == 4
+        # copy is essential here, the arrays get modified in place by the editor
+        self.__positions = positions.copy()
+        self.__orientations = orientations.copy()
 
     def get_grasps(self):
-        return self.__grasps
+        return self.__positions, self.__orientations
 
     def set_selected_grasp_index(self, selected_grasp_index):
         assert isinstance(selected_grasp_index, int)
-        self.__selected_grasp_index = copy.deepcopy(selected_grasp_index)
+        self.__selected_grasp_index = selected_grasp_index
 
     def get_selected_grasp_index(self):
         return self.__selected_grasp_index
 
 class Grasps:
-    def __init__(self, reference_frame='object', history_buffer_size=100):
+    '''
+    grasps are stored as two contiguous arrays (positions and quaternions) which are the source of truth,
+    geometry_msgs/Pose and PoseArray msgs are only built when requested
+    '''
+    def __init__(self, reference_frame='object', history_buffer_size=100, initial_capacity=16):
         self.reference_frame = reference_frame
         self.history_buffer_size = history_buffer_size # the maximum number of times you can perform undo
         self.grasp_history = None
         self.undo_index = None
         self.__pause_history = None
-        self.grasps_as_pose_array = None
+        self._pos = np.empty((initial_capacity, 3)) # grasp positions, only the first _n rows are valid
+        self._quat = np.empty((initial_capacity, 4)) # grasp orientations, only the first _n rows are valid
+        self._n = 0 # number of grasps
+        self._pose_array = None # PoseArray msg built from _pos and _quat, None if it needs to be rebuilt
         # flag used to highlight a grasp in green color, set to -1 to not highlight any pose in particular
         self.selected_grasp_index = None
         self.__init() # must be called at the end of this constructor
 
     def __init(self):
-        self.grasps_as_pose_array = PoseArray()
-        self.grasps_as_pose_array.header.frame_id = self.reference_frame
         self.__pause_history = False
         self.selected_grasp_index = -1
         self.undo_index = -1
@@ -51,6 +74,56 @@ class Grasps:
             self.grasp_history.append(None)
         self.add_state_to_history()
 
+    @property
+    def grasps_as_pose_array(self):
+        return self.get_grasps_as_pose_array_msg()
+
+    def _grasps_modified(self):
+        # invalidate the PoseArray msg, it will be rebuilt the next time it is requested
+        self._pose_array = None
+
+    def _rebuild_pose_array(self):
+        pose_array = PoseArray()
+        pose_array.header.frame_id = self.reference_frame
+        pose_array.poses = [make_pose_msg(p, q) for p, q in zip(self._pos[:self._n].tolist(), self._quat[:self._n].tolist())]
+        return pose_array
+
+    def _reserve(self, capacity):
+        '''
+        grow the position and orientation buffers (amortized doubling) to hold at least capacity grasps
+        '''
+        if capacity <= len(self._pos):
+            return
+        new_capacity = max(capacity, 2 * len(self._pos))
+        for name, width in (('_pos', 3), ('_quat', 4)):
+            new_buffer = np.empty((new_capacity, width))
+            new_buffer[:self._n] = getattr(self, name)[:self._n]
+            setattr(self, name, new_buffer)
+
+    def _allocate(self, n_new):
+        '''
+        grow the number of grasps by n_new and return the slice of the new (uninitialized) rows
+        '''
+        self._reserve(self._n + n_new)
+        new_rows = slice(self._n, self._n + n_new)
+        self._n += n_new
+        self._grasps_modified()
+        return new_rows
+
+    def _valid_index(self, grasp_index):
+        '''
+        return grasp_index as a row of the valid part of the buffers, negative indices count from the last grasp
+        like in a python list, raise IndexError if it is out of range
+        '''
+        if not -self._n <= grasp_index < self._n:
+            raise IndexError(f'grasp index {grasp_index} out of range, there are {self._n} grasps')
+        return grasp_index % self._n
+
+    def _append(self, positions, orientations):
+        new_rows = self._allocate(len(positions))
+        self._pos[new_rows] = positions
+        self._quat[new_rows] = orientations
+
     def pause_history(self):
         self.__pause_history = True
 
@@ -59,7 +132,7 @@ class Grasps:
 
     def get_current_state(self):
         state = GraspEditorState()
-        state.set_grasps(self.grasps_as_pose_array.poses)
+        state.set_grasps(self._pos[:self._n], self._quat[:self._n])
         state.set_selected_grasp_index(self.selected_grasp_index)
         return state
 
@@ -79,13 +152,23 @@ class Grasps:
 
     def add_grasp(self, grasp):
         assert isinstance(grasp, Pose)
-        self.grasps_as_pose_array.poses.append(grasp)
+        self._append(*poses_to_arrays([grasp]))
         self.add_state_to_history()
 
     def add_grasps(self, pose_array_grasps):
+        '''
+        add all grasps at once, undo removes them all in a single step
+        '''
         assert isinstance(pose_array_grasps, PoseArray)
-        for grasp in pose_array_grasps.poses:
-            self.add_grasp(grasp)
+        self.add_grasps_from_arrays(*poses_to_arrays(pose_array_grasps.poses))
+
+    def add_grasps_from_arrays(self, positions, orientations):
+        '''
+        add grasps given as positions (N, 3) and orientations (N, 4), undo removes them all in a single step
+        '''
+        assert positions.shape[1] == 3 and orientations.shape[1] == 4 and len(positions) == len(orientations)
+        self._append(positions, orientations)
+        self.add_state_to_history()
 
     def rotate_grasp(self, grasp, roll=0., pitch=0., yaw=0.):
         return self.transform_grasp(grasp, angular_rpy=[roll, pitch, yaw])
@@ -101,80 +184,117 @@ class Grasps:
         assert isinstance(grasp, Pose)
         assert isinstance(linear, list)
         assert isinstance(angular_rpy, list)
-        derived_grasp = copy.deepcopy(grasp)
-        q_orig = np.array([derived_grasp.orientation.x, derived_grasp.orientation.y,\
-                           derived_grasp.orientation.z, derived_grasp.orientation.w])
-        angular_q = tf.transformations.quaternion_from_euler(angular_rpy[0], angular_rpy[1], angular_rpy[2])
-        q_new = tf.transformations.quaternion_multiply(angular_q, q_orig)
-        derived_grasp.position.x += linear[0]
-        derived_grasp.position.y += linear[1]
-        derived_grasp.position.z += linear[2]
-        derived_grasp.orientation.x = q_new[0]
-        derived_grasp.orientation.y = q_new[1]
-        derived_grasp.orientation.z = q_new[2]
-        derived_grasp.orientation.w = q_new[3]
-        return derived_grasp
+        q_orig = [grasp.orientation.x, grasp.orientation.y, grasp.orientation.z, grasp.orientation.w]
+        q_new = (Rotation.from_euler('xyz', angular_rpy) * Rotation.from_quat(q_orig)).as_quat().tolist()
+        # build a new msg from the floats instead of deep copying the input grasp
+        return make_pose_msg([grasp.position.x + linear[0], grasp.position.y + linear[1], grasp.position.z + linear[2]],\
+                             q_new)
 
     def rotate_grasps(self, grasps, roll=0., pitch=0., yaw=0., replace=False):
         self.transform_grasps(grasps, angular_rpy=[roll, pitch, yaw], replace=replace)
 
     def find_grasp_index(self, grasp):
         assert isinstance(grasp, Pose)
-        for i, g in enumerate(self.grasps_as_pose_array.poses):
-            if np.allclose(grasp.position.x, g.position.x):
-                if np.allclose(grasp.position.y, g.position.y):
-                    if np.allclose(grasp.position.z, g.position.z):
-                        if np.allclose(grasp.orientation.x, grasp.orientation.x):
-                            if np.allclose(grasp.orientation.y, grasp.orientation.y):
-                                if np.allclose(grasp.orientation.z, grasp.orientation.z):
-                                    if np.allclose(grasp.orientation.w, grasp.orientation.w):
-                                        return i
-        return -1
+        position, orientation = poses_to_arrays([grasp])
+        matches = np.flatnonzero(np.isclose(self._pos[:self._n], position).all(axis=1) &\
+                                 np.isclose(self._quat[:self._n], orientation).all(axis=1))
+        if len(matches) == 0:
+            return -1
+        return int(matches[0])
 
     def transform_grasps(self, grasps, linear=[0., 0., 0.], angular_rpy=[0., 0., 0.], replace=False):
+        '''
+        apply the same incremental transform to all input grasps
+        the rotation is built once and multiplied with all grasp orientations in a single batched operation
+        '''
         assert isinstance(grasps, list)
-        self.pause_history() # for undo to work on all pattern poses we pause history
-        static_grasps = copy.deepcopy(grasps)
-        for grasp in static_grasps:
+        for grasp in grasps:
             assert isinstance(grasp, Pose)
-            derived_grasp = copy.deepcopy(grasp)
-            derived_grasp = self.transform_grasp(grasp, linear, angular_rpy)
-            if replace:
-                grasp_index = self.find_grasp_index(grasp)
-                if grasp_index == -1:
-                    raise ValueError('Could not find grasp index while trying to replace after transform, this should not happen.')
-                self.replace_grasp_by_index(grasp_index, derived_grasp)
-            else:
-                self.add_grasp(derived_grasp)
-        self.unpause_history() # for undo to work on all pattern poses we unpause history
+        grasp_indices = None
+        if replace:
+            grasp_indices = [self.find_grasp_index(grasp) for grasp in grasps]
+            if -1 in grasp_indices:
+                raise ValueError('Could not find grasp index while trying to replace after transform, this should not happen.')
+        self.apply_transform(*poses_to_arrays(grasps), linear, angular_rpy, grasp_indices)
+
+    def apply_transform(self, positions, orientations, linear=[0., 0., 0.], angular_rpy=[0., 0., 0.], grasp_indices=None):
+        '''
+        transform the input positions (N, 3) and orientations (N, 4)
+        if grasp_indices is None the result is added as new grasps, otherwise it replaces the grasps at those indices
+        '''
+        if len(positions) > 0:
+            positions = positions + np.asarray(linear)
+            orientations = (Rotation.from_euler('xyz', angular_rpy) * Rotation.from_quat(orientations)).as_quat()
+        self.set_or_add_grasps(positions, orientations, grasp_indices)
+
+    def set_or_add_grasps(self, positions, orientations, grasp_indices=None):
+        if grasp_indices is None:
+            self._append(positions, orientations)
+        else:
+            self._pos[grasp_indices] = positions
+            self._quat[grasp_indices] = orientations
+            self._grasps_modified()
         self.add_state_to_history()
 
     def rotate_selected_grasps(self, roll=0., pitch=0., yaw=0., replace=False):
         return self.transform_selected_grasps(angular_rpy=[roll, pitch, yaw], replace=replace)
 
     def transform_selected_grasps(self, linear=[0., 0., 0.], angular_rpy=[0., 0., 0.], replace=False):
-        if self.no_grasp_is_selected():
+        grasp_indices = self.get_selected_grasp_indices()
+        if len(grasp_indices) == 0:
             return False
-        grasps = self.get_selected_grasps()
-        assert isinstance(grasps, list)
-        if grasps == []:
+        self.apply_transform(self._pos[grasp_indices], self._quat[grasp_indices], linear, angular_rpy,\
+                             grasp_indices if replace else None)
+        return True
+
+    def rotate_selected_grasps_pattern(self, roll_step=0., pitch_step=0., yaw_step=0., number_of_grasps=2, replace=False):
+        '''
+        circular pattern: rotate the selected grasps number_of_grasps - 1 times by an increasing angle
+        (k * step for k = 1, ..., number_of_grasps - 1), all rotations are computed in one batched operation
+        if replace is True the selected grasps are replaced by the last rotation of the pattern
+        '''
+        assert number_of_grasps > 1
+        grasp_indices = self.get_selected_grasp_indices()
+        if len(grasp_indices) == 0:
             return False
-        else:
-            self.transform_grasps(grasps, linear, angular_rpy, replace)
+        steps = np.arange(1, number_of_grasps).reshape(-1, 1) * np.array([roll_step, pitch_step, yaw_step])
+        if replace:
+            steps = steps[-1:]
+        # one rotation per (pattern step, grasp) pair, ordered by pattern step
+        angular_r = Rotation.from_euler('xyz', np.repeat(steps, len(grasp_indices), axis=0))
+        orientations = (angular_r * Rotation.from_quat(np.tile(self._quat[grasp_indices], (len(steps), 1)))).as_quat()
+        if replace:
+            self.set_or_add_grasps(self._pos[grasp_indices], orientations, grasp_indices)
             return True
+        # allocate all pattern grasps at once and write the results directly into the buffers
+        positions = self._pos[grasp_indices]
+        new_rows = self._allocate(len(orientations))
+        self._pos[new_rows].reshape(len(steps), len(grasp_indices), 3)[:] = positions
+        self._quat[new_rows] = orientations
+        self.add_state_to_history()
+        return True
 
     def remove_grasp(self, grasp):
         assert isinstance(grasp, Pose)
-        self.grasps_as_pose_array.poses.remove(grasp)
-        self.add_state_to_history()
+        position, orientation = poses_to_arrays([grasp])
+        matches = np.flatnonzero((self._pos[:self._n] == position).all(axis=1) &\
+                                 (self._quat[:self._n] == orientation).all(axis=1))
+        if len(matches) == 0:
+            raise ValueError('grasp to be removed was not found')
+        self.remove_grasp_by_index(int(matches[0]))
 
     def remove_grasp_by_index(self, grasp_index):
         assert isinstance(grasp_index, int)
         if grasp_index == -10:
             self.remove_all_grasps()
         elif grasp_index != -1:
-            grasp = self.grasps_as_pose_array.poses[grasp_index]
-            self.remove_grasp(grasp)
+            grasp_index = self._valid_index(grasp_index)
+            # shift the remaining grasps one row up to keep the grasp order
+            self._pos[grasp_index:self._n - 1] = self._pos[grasp_index + 1:self._n]
+            self._quat[grasp_index:self._n - 1] = self._quat[grasp_index + 1:self._n]
+            self._n -= 1
+            self._grasps_modified()
+            self.add_state_to_history()
 
     def remove_selected_grasp(self):
         if self.all_grasps_are_selected():
@@ -187,30 +307,38 @@ class Grasps:
         self.remove_selected_grasp()
 
     def remove_all_but_one_grasp(self):
-        grasp_zero = copy.deepcopy(self.grasps_as_pose_array.poses[0])
-        self.grasps_as_pose_array.poses = [grasp_zero]
+        self._n = min(self._n, 1)
+        self._grasps_modified()
         self.select_grasp(0)
 
     def remove_all_grasps(self):
-        self.grasps_as_pose_array.poses = []
+        self._n = 0
+        self._grasps_modified()
         self.unselect_all_grasps()
 
     def get_grasp_by_index(self, grasp_index):
         assert isinstance(grasp_index, int)
-        assert grasp_index >= 0
-        return copy.deepcopy(self.grasps_as_pose_array.poses[grasp_index])
+        assert grasp_index >= 0 and grasp_index < self._n
+        return make_pose_msg(self._pos[grasp_index].tolist(), self._quat[grasp_index].tolist())
 
     def replace_grasp_by_index(self, grasp_index, new_grasp):
         assert isinstance(grasp_index, int)
         assert isinstance(new_grasp, Pose)
-        self.grasps_as_pose_array.poses[grasp_index] = new_grasp
-        self.add_state_to_history()
+        self.set_or_add_grasps(*poses_to_arrays([new_grasp]), [grasp_index])
 
     def get_grasps_as_pose_list(self):
-        return copy.deepcopy(self.grasps_as_pose_array.poses)
+        return self._rebuild_pose_array().poses
 
     def get_grasps_as_pose_array_msg(self):
-        return self.grasps_as_pose_array
+        if self._pose_array is None:
+            self._pose_array = self._rebuild_pose_array()
+        return self._pose_array
+
+    def get_grasps_as_arrays(self):
+        '''
+        return a copy of the grasp positions (N, 3) and orientations (N, 4)
+        '''
+        return self._pos[:self._n].copy(), self._quat[:self._n].copy()
 
     def no_grasp_is_selected(self):
         '''
@@ -243,6 +371,16 @@ class Grasps:
         elif self.selected_grasp_index == -10: # all grasps are selected
             return self.get_grasps_as_pose_list()
 
+    def get_selected_grasp_indices(self):
+        '''
+        return the indices of the selected grasps as an array, empty if no grasp is selected
+        '''
+        if self.single_grasp_is_selected():
+            return np.array([self._valid_index(self.selected_grasp_index)])
+        elif self.all_grasps_are_selected():
+            return np.arange(self._n)
+        return np.array([], dtype=int)
+
     def get_selected_grasp_index(self):
         return self.selected_grasp_index
 
@@ -274,11 +412,13 @@ class Grasps:
             return True
 
     def size(self):
-        return len(self.grasps_as_pose_array.poses)
+        return self._n
 
     def restore_state(self):
         state = self.grasp_history[self.undo_index]
-        self.grasps_as_pose_array.poses = state.get_grasps()
+        positions, orientations = state.get_grasps()
+        self._n = 0
+        self._append(positions, orientations)
         self.selected_grasp_index = state.get_selected_grasp_index()
 
     def undo(self):
@@ -119,6 +119,59 @@ class TestGrasps(unittest.TestCase):
         self.assertEquals(np.allclose(desired_q, q0), True)
         self.assertEquals(np.allclose(desired_q, q1), True)
 
+    def test_rotate_grasps_pattern(self):
+        g = self.get_grasps_object()
+        g.select_grasp(0)
+        g.rotate_selected_grasps_pattern(yaw_step=math.radians(90.0), number_of_grasps=4)
+        self.assertEquals(g.size(), 4)
+        # quaternions with a 90, 180 and 270 degree yaw rotation
+        desired_qs = [[0.0, 0.0, 0.7071067811865475, 0.7071067811865476],
+                      [0.0, 0.0, 1.0, 0.0],
+                      [0.0, 0.0, 0.7071067811865476, -0.7071067811865475]]
+        for i, desired_q in enumerate(desired_qs):
+            q = self.pose_to_quaternion_list(g.get_grasp_by_index(i + 1))
+            self.assertEquals(np.allclose(desired_q, q), True)
+
+    def test_remove_grasp_by_index_keeps_order(self):
+        g = self.get_grasps_object()
+        for i in range(1, 40): # exceed the initial buffer capacity
+            grasp = self.get_identity_grasp_msg()
+            grasp.position.x = float(i)
+            g.add_grasp(grasp)
+        self.assertEquals(g.size(), 40)
+        g.remove_grasp_by_index(10)
+        self.assertEquals(g.size(), 39)
+        self.assertEquals(g.get_grasp_by_index(9).position.x, 9.0)
+        self.assertEquals(g.get_grasp_by_index(10).position.x, 11.0)
+        g.undo()
+        self.assertEquals(g.size(), 40)
+        self.assertEquals(g.get_grasp_by_index(10).position.x, 10.0)
+
+    def test_remove_grasp_by_negative_index(self):
+        g = self.get_grasps_object()
+        for i in range(1, 3):
+            grasp = self.get_identity_grasp_msg()
+            grasp.position.x = float(i)
+            g.add_grasp(grasp)
+        g.remove_grasp_by_index(-3) # counts from the last grasp, like a python list
+        self.assertEquals(g.size(), 2)
+        self.assertEquals(g.get_grasp_by_index(0).position.x, 1.0)
+        self.assertRaises(IndexError, g.remove_grasp_by_index, -3)
+        g.select_grasp(-5)
+        self.assertRaises(IndexError, g.get_selected_grasp_indices)
+
+    def test_add_grasps_from_arrays(self):
+        g = self.get_grasps_object()
+        positions = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]])
+        orientations = np.array([[0.0, 0.0, 0.0, 1.0], [0.0, 0.0, 1.0, 0.0]])
+        g.add_grasps_from_arrays(positions, orientations)
+        self.assertEquals(g.size(), 3)
+        grasp = g.get_grasp_by_index(2)
+        self.assertEquals([grasp.position.x, grasp.position.y, grasp.position.z], [0.4, 0.5, 0.6])
+        self.assertEquals(self.pose_to_quaternion_list(grasp), [0.0, 0.0, 1.0, 0.0])
+        g.undo()
+        self.assertEquals(g.size(), 1)
+
     def test_find_grasp_index(self):
         g = self.get_grasps_object()
         grasp_index = g.find_grasp_index(self.get_identity_grasp_msg())
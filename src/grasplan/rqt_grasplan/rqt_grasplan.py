@@ -3,9 +3,20 @@
 import os
 import tf
 import math
+import pickle
+import hashlib
+import tempfile
 import rospy
 import rospkg
 import yaml
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+try:
+    # libyaml C parser and emitter, much faster than the pure python ones
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
 
 from qt_gui.plugin import Plugin
 from python_qt_binding import loadUi
@@ -14,9 +25,58 @@ from python_qt_binding.QtWidgets import QWidget, QFileDialog, QMessageBox
 from grasplan.rqt_grasplan.grasps import Grasps
 from grasplan.visualisation.grasp_visualiser import GraspVisualiser
 
-from std_msgs.msg import Int8, String
+from std_msgs.msg import Int8
 from geometry_msgs.msg import Pose, PoseArray, PoseStamped
 
+# yaml format of a single grasp, used to print grasps to console
+GRASP_PRINT_FORMAT = '    -\n      translation: [{},{},{}]\n      rotation: [{},{},{},{}]'
+
+class GraspsYamlDumper(YamlDumper):
+    '''
+    yaml dumper that writes floats with a fixed number of 6 decimals
+    '''
+
+GraspsYamlDumper.add_representer(float, lambda dumper, value: dumper.represent_scalar('tag:yaml.org,2002:float', f'{value:.6f}'))
+
+def format_number(value, ndigits):
+    '''
+    round a number for displaying it in a textbox
+    adding 0.0 turns a negative zero (e.g. round(-0.001, 2)) into 0.0, so -0.0 is never displayed
+    '''
+    return str(round(value, ndigits) + 0.0)
+
+def load_yaml_file(yaml_path, cache_dir=os.path.join(os.path.expanduser('~'), '.cache', 'grasplan')):
+    '''
+    parse a yaml file and return its content as dictionary
+    the result is pickled to cache_dir and reused as long as the yaml file modification time and size do not change
+    '''
+    yaml_path = os.path.abspath(yaml_path)
+    yaml_stat = os.stat(yaml_path)
+    file_signature = (yaml_stat.st_mtime_ns, yaml_stat.st_size)
+    cache_path = os.path.join(cache_dir, hashlib.sha1(yaml_path.encode('utf-8')).hexdigest() + '.pkl')
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_signature, yaml_content = pickle.load(f)
+        if cached_signature == file_signature:
+            return yaml_content
+    except Exception:
+        pass # missing, corrupt or outdated cache file, parse the yaml file
+    with open(yaml_path) as f:
+        yaml_content = yaml.load(f, Loader=YamlLoader)
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # write to a temporary file first so that an interrupted or concurrent write never leaves a truncated cache
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((file_signature, yaml_content), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        rospy.logwarn(f'could not write yaml cache file {cache_path}: {e}')
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return yaml_content
+
 class OpenFileDialog(QWidget):
     '''
     allow the user to select a different yaml file with a button,
@@ -69,34 +129,46 @@ class RqtGrasplan(Plugin):
         if context.serial_number() > 1:
             self._widget.setWindowTitle(self._widget.windowTitle() + (' (%d)' % context.serial_number()))
 
+        # transform group textboxes: linear x, y, z, angular r, p, y and quaternion x, y, z, w
+        self.tf_textboxes = (self._widget.txtTransformLinearX, self._widget.txtTransformLinearY,\
+                             self._widget.txtTransformLinearZ, self._widget.txtTransformAngularR,\
+                             self._widget.txtTransformAngularP, self._widget.txtTransformAngularY,\
+                             self._widget.txtTransformAngularQx, self._widget.txtTransformAngularQy,\
+                             self._widget.txtTransformAngularQz, self._widget.txtTransformAngularQw)
+
         # variables
         self.grasps = Grasps() # stores all grasps
         self.grasps_yaml_path = None
         self.object_class = None
-        self.tab = '    ' # used in save function
         self.global_reference_frame = 'object'
 
         # publications
-        self.pose_highlight_pub = rospy.Publisher('/rviz_gripper_visualiser/highlight_pose', Int8, queue_size=1)
-        self.object_mesh_pub = rospy.Publisher('/grasp_editor/update_object_mesh', String, queue_size=1)
-        self.grasp_poses_pub = rospy.Publisher('/grasp_editor/grasp_poses', PoseArray, queue_size=1)
+        # grasps and highlight are only published when they change, latch them for late subscribers
+        self.pose_highlight_pub = rospy.Publisher('/rviz_gripper_visualiser/highlight_pose', Int8, queue_size=1, latch=True)
+        self.grasp_poses_pub = rospy.Publisher('/grasp_editor/grasp_poses', PoseArray, queue_size=1, latch=True)
+        self.pose_highlight_msg = Int8()
+        self.published_pose_array_msg = None # last published grasps msg, used to skip publishing unchanged grasps
+        self.published_highlight = None # last published highlighted grasp index
         self.test_pose_pub = rospy.Publisher('/test_pose', PoseStamped, queue_size=1)
 
         # parameters
-        obj_pkg_name = rospy.get_param('~obj_pkg_name', 'mobipick_gazebo')
+        self.obj_pkg_name = rospy.get_param('~obj_pkg_name', 'mobipick_gazebo')
         if rospy.has_param('~object_name'):
             self.object_class = rospy.get_param('~object_name')
             # set object name to textbox
             self._widget.txtFileObjectName.setText(self.object_class)
             if rospy.has_param('~grasps_yaml_path'):
                 self.grasps_yaml_path = rospy.get_param('~grasps_yaml_path') + f'/handcoded_grasp_planner_{self.object_class}.yaml'
-                self.grasps.add_grasps(self.load_grasps_from_yaml(self.object_class, self.grasps_yaml_path))
+                grasps = self.load_grasps_from_yaml(self.object_class, self.grasps_yaml_path)
+                if grasps is not None:
+                    self.grasps.add_grasps_from_arrays(*grasps)
             else:
                 rospy.logwarn('object name parameter is set but grasps_yaml_path param is missing, is this correct?')
 
-        # publish object mesh to rviz with texture
-        grasp_visualiser = GraspVisualiser()
-        grasp_visualiser.update_mesh(object_name=self.object_class, object_pkg=obj_pkg_name)
+        # publish object mesh to rviz with texture, the visualiser is kept to update the mesh when another object is loaded
+        self.grasp_visualiser = GraspVisualiser()
+        self.grasp_visualiser.update_mesh(object_name=self.object_class, object_pkg=self.obj_pkg_name)
+        self.published_mesh_object_class = self.object_class # object whose mesh is currently shown in rviz
 
         # visualise grasps at startup
         self.publish_grasps()
@@ -174,30 +246,22 @@ class RqtGrasplan(Plugin):
         pose_stamped_msg = self.list_to_pose_stamped_msg(linear, angular_q)
         self.test_pose_pub.publish(pose_stamped_msg)
 
-    def write_grasps_to_yaml_file(self, grasps, object_name, grasps_yaml_path):
-        grasp_stream_list = ['# this file was generated automatically by grasplan grasp editor']
-        tab = '  '
-        grasp_stream_list.append(f'{object_name}:')
-        grasp_stream_list.append(f'{tab}grasp_poses:')
-        for grasp in grasps:
-            linear = [grasp.position.x, grasp.position.y, grasp.position.z]
-            angular_q = [grasp.orientation.x, grasp.orientation.y, grasp.orientation.z, grasp.orientation.w]
-            grasp_stream_list.append(f'{tab}{tab}-')
-            # translation
-            translation_str = f'{tab}{tab}{tab}translation: [{linear[0]:.6f}, {linear[1]:.6f}, {linear[2]:.6f}]'
-            grasp_stream_list.append(translation_str)
-            # rotation
-            rotation_str = f'{tab}{tab}{tab}rotation: [{angular_q[0]:.6f}, {angular_q[1]:.6f}, {angular_q[2]:.6f}, {angular_q[3]:.6f}]'
-            grasp_stream_list.append(rotation_str)
+    def write_grasps_to_yaml_file(self, positions, orientations, object_name, grasps_yaml_path):
+        '''
+        positions: (N, 3) array, orientations: (N, 4) array of quaternions
+        '''
+        grasps_dic = {object_name: {'grasp_poses': [{'translation': linear, 'rotation': angular_q}\
+                      for linear, angular_q in zip(positions.tolist(), orientations.tolist())]}}
         rospy.loginfo(f'writing grasps to file: {grasps_yaml_path}')
-        f = open(grasps_yaml_path,'w+')
-        for string in grasp_stream_list:
-            f.write(string + '\n')
-        f.close()
+        grasps_yaml = '# this file was generated automatically by grasplan grasp editor\n' +\
+                      yaml.dump(grasps_dic, Dumper=GraspsYamlDumper, default_flow_style=None, sort_keys=False)
+        # the whole file is written with a single write call
+        with open(grasps_yaml_path, 'wb') as f:
+            f.write(grasps_yaml.encode('utf-8'))
 
     def handle_file_save_grasps_button(self):
         rospy.loginfo('saving grasps!')
-        self.write_grasps_to_yaml_file(self.grasps.get_grasps_as_pose_list(),\
+        self.write_grasps_to_yaml_file(*self.grasps.get_grasps_as_arrays(),\
                                        self._widget.txtFileObjectName.toPlainText(),\
                                        self.grasps_yaml_path)
 
@@ -208,29 +272,10 @@ class RqtGrasplan(Plugin):
             self.grasps_yaml_path = grasps_yaml_path_candidate
             self.handle_file_save_grasps_button()
 
-    def fix_displayed_text(self):
-        '''
-        sometimes the text boxes show a -0.0 number, this functions converts it into 0.0
-        '''
-        if self._widget.txtTransformLinearX.toPlainText() == '-0.0':
-            self._widget.txtTransformLinearX.setPlainText('0.0')
-        if self._widget.txtTransformLinearY.toPlainText() == '-0.0':
-            self._widget.txtTransformLinearY.setPlainText('0.0')
-        if self._widget.txtTransformLinearZ.toPlainText() == '-0.0':
-            self._widget.txtTransformLinearZ.setPlainText('0.0')
-        if self._widget.txtTransformAngularR.toPlainText() == '-0.0':
-            self._widget.txtTransformAngularR.setPlainText('0.0')
-        if self._widget.txtTransformAngularP.toPlainText() == '-0.0':
-            self._widget.txtTransformAngularP.setPlainText('0.0')
-        if self._widget.txtTransformAngularY.toPlainText() == '-0.0':
-            self._widget.txtTransformAngularY.setPlainText('0.0')
-
     def write_rpy_to_tf_textbox(self, angular_rpy):
-        self._widget.txtTransformAngularR.setPlainText(str(round(angular_rpy[0], 2)))
-        self._widget.txtTransformAngularP.setPlainText(str(round(angular_rpy[1], 2)))
-        self._widget.txtTransformAngularY.setPlainText(str(round(angular_rpy[2], 2)))
-        # avoid -0.0 being displayed as text
-        self.fix_displayed_text()
+        self._widget.txtTransformAngularR.setPlainText(format_number(angular_rpy[0], 2))
+        self._widget.txtTransformAngularP.setPlainText(format_number(angular_rpy[1], 2))
+        self._widget.txtTransformAngularY.setPlainText(format_number(angular_rpy[2], 2))
 
     def handle_transform_q_2_rpy_button(self):
         '''
@@ -238,18 +283,19 @@ class RqtGrasplan(Plugin):
         additionally it publishes the transform as pose stamped msg for visualisation purposes
         '''
         linear, angular_rpy, angular_q = self.read_transform(apply_rpy_to_q=False)
-        angular_rpy = list(tf.transformations.euler_from_quaternion(angular_q))
-        if self._widget.optTransformUnitsDeg.isChecked():
-            # angular_rpy is required in degrees
-            angular_rpy = self.convert_rpy_rad_to_deg(angular_rpy)
+        try:
+            angular_rpy = Rotation.from_quat(angular_q).as_euler('xyz', degrees=self._widget.optTransformUnitsDeg.isChecked())
+        except ValueError: # zero norm quaternion
+            self.log_error(f'Cannot convert quaternion {[*angular_q]} to rpy, it must not be all zeros')
+            return
         self.write_rpy_to_tf_textbox(angular_rpy)
         self.publish_test_pose(angular_q=[*angular_q])
 
     def write_q_to_tf_textbox(self, quaternion):
-        self._widget.txtTransformAngularQx.setPlainText(str(round(quaternion[0], 4)))
-        self._widget.txtTransformAngularQy.setPlainText(str(round(quaternion[1], 4)))
-        self._widget.txtTransformAngularQz.setPlainText(str(round(quaternion[2], 4)))
-        self._widget.txtTransformAngularQw.setPlainText(str(round(quaternion[3], 4)))
+        self._widget.txtTransformAngularQx.setPlainText(format_number(quaternion[0], 4))
+        self._widget.txtTransformAngularQy.setPlainText(format_number(quaternion[1], 4))
+        self._widget.txtTransformAngularQz.setPlainText(format_number(quaternion[2], 4))
+        self._widget.txtTransformAngularQw.setPlainText(format_number(quaternion[3], 4))
 
     def handle_transform_rpy_2_q_button(self):
         '''
@@ -265,30 +311,40 @@ class RqtGrasplan(Plugin):
         '''
         publish a string topic that indicates an integer containing which grasp needs to be drawn in different color
         publish grasps as pose array msg for visualisation purposes
+        only what changed since the last call gets published
         '''
-        self.pose_highlight_pub.publish(self.grasps.get_selected_grasp_index())
-        self.grasp_poses_pub.publish(self.grasps.get_grasps_as_pose_array_msg())
+        selected_grasp_index = self.grasps.get_selected_grasp_index()
+        highlight_changed = selected_grasp_index != self.published_highlight
+        if highlight_changed:
+            self.pose_highlight_msg.data = selected_grasp_index
+            self.pose_highlight_pub.publish(self.pose_highlight_msg)
+            self.published_highlight = selected_grasp_index
+        # Grasps builds a new pose array msg after every modification, an unchanged msg object means unchanged grasps
+        pose_array_msg = self.grasps.get_grasps_as_pose_array_msg()
+        # the rviz visualiser only redraws the highlight when it receives grasps, republish them on highlight changes too
+        if highlight_changed or pose_array_msg is not self.published_pose_array_msg:
+            self.grasp_poses_pub.publish(pose_array_msg)
+            self.published_pose_array_msg = pose_array_msg
 
     def handle_file_print_grasps_button(self):
         '''
         print grasps to console in yaml format
         '''
         rospy.loginfo('print!')
-        for grasp in self.grasps.get_grasps_as_pose_list():
-            print(f'{self.tab}-\n{self.tab}  translation: [{grasp.position.x},{grasp.position.y},{grasp.position.z}]\n' +\
-                     f'{self.tab}  rotation: [{grasp.orientation.x},{grasp.orientation.y},\
-                                              {grasp.orientation.z},{grasp.orientation.w}]')
+        positions, orientations = self.grasps.get_grasps_as_arrays()
+        print('\n'.join([GRASP_PRINT_FORMAT.format(*linear, *angular_q)\
+                         for linear, angular_q in zip(positions.tolist(), orientations.tolist())]))
 
     def load_grasps_from_yaml(self, object_class, grasps_yaml_path):
+        '''
+        return the grasps of object_class as positions (N, 3) and orientations (N, 4) arrays, None on failure
+        '''
         rospy.loginfo(f'reloading grasps from file: {grasps_yaml_path}')
-        grasps_as_pose_array = PoseArray()
-        grasps_as_pose_array.header.frame_id = self.global_reference_frame
         grasps_dic = None
-        with open(grasps_yaml_path) as f:
-            try:
-                grasps_dic = yaml.full_load(f)
-            except yaml.YAMLError as e:
-                self.log_error(e)
+        try:
+            grasps_dic = load_yaml_file(grasps_yaml_path)
+        except yaml.YAMLError as e:
+            self.log_error(e)
         if grasps_dic is None:
             return None
         # load grasps from param server
@@ -297,12 +353,19 @@ class RqtGrasplan(Plugin):
             return None
         else:
             rospy.loginfo(f'loading {object_class} grasps from yaml file: {grasps_yaml_path}')
-            for transform in grasps_dic[object_class]['grasp_poses']:
-                pose_msg = self.list_to_pose_msg(transform['translation'], transform['rotation'])
-                grasps_as_pose_array.poses.append(pose_msg)
-        # update object mesh in rviz
-        self.object_mesh_pub.publish(object_class)
-        return grasps_as_pose_array
+            grasp_poses = grasps_dic[object_class]['grasp_poses']
+            positions = np.array([g['translation'] for g in grasp_poses], dtype=np.float64).reshape(-1, 3)
+            orientations = np.array([g['rotation'] for g in grasp_poses], dtype=np.float64).reshape(-1, 4)
+        return positions, orientations
+
+    def publish_object_mesh(self, object_class):
+        '''
+        update the object mesh in rviz, skipped if the mesh of this object is already shown
+        '''
+        if object_class == self.published_mesh_object_class:
+            return
+        self.grasp_visualiser.update_mesh(object_name=object_class, object_pkg=self.obj_pkg_name)
+        self.published_mesh_object_class = object_class
 
     def handle_file_load_grasps_button(self):
         rospy.loginfo('reload!')
@@ -311,7 +374,8 @@ class RqtGrasplan(Plugin):
         if grasps is None:
             return
         self.grasps.remove_all_grasps()
-        self.grasps.add_grasps(grasps)
+        self.grasps.add_grasps_from_arrays(*grasps)
+        self.publish_object_mesh(self.object_class)
         self.publish_grasps()
         self.update_grasp_number_label()
 
@@ -327,21 +391,9 @@ class RqtGrasplan(Plugin):
                 return False
 
     def write_linear_to_tf_textbox(self, linear):
-        self._widget.txtTransformLinearX.setPlainText(str(round(linear[0], 3)))
-        self._widget.txtTransformLinearY.setPlainText(str(round(linear[1], 3)))
-        self._widget.txtTransformLinearZ.setPlainText(str(round(linear[2], 3)))
-
-    def convert_rpy_rad_to_deg(self, rpy_in_rad):
-        rpy_in_deg = []
-        for i in range(3): # 0, 1, 2
-            rpy_in_deg.append(math.degrees(rpy_in_rad[i]))
-        return rpy_in_deg
-
-    def convert_rpy_deg_to_rad(self, rpy_in_deg):
-        rpy_in_rad = []
-        for i in range(3): # 0, 1, 2
-            rpy_in_rad.append(math.radians(rpy_in_deg[i]))
-        return rpy_in_rad
+        self._widget.txtTransformLinearX.setPlainText(format_number(linear[0], 3))
+        self._widget.txtTransformLinearY.setPlainText(format_number(linear[1], 3))
+        self._widget.txtTransformLinearZ.setPlainText(format_number(linear[2], 3))
 
     def handle_grasp_s_select_button(self):
         '''
@@ -354,20 +406,20 @@ class RqtGrasplan(Plugin):
             if self._widget.chkTransformLoadSelected.isChecked():
                 if self.grasps.single_grasp_is_selected():
                     selected_grasp = self.grasps.get_selected_grasp()
-                    self.write_linear_to_tf_textbox([selected_grasp.position.x,\
-                                                     selected_grasp.position.y,\
-                                                     selected_grasp.position.z])
                     angular_q = [selected_grasp.orientation.x, selected_grasp.orientation.y,\
                                  selected_grasp.orientation.z, selected_grasp.orientation.w]
-                    self.write_q_to_tf_textbox(angular_q)
-                    angular_rpy = list(tf.transformations.euler_from_quaternion(angular_q))
-                    if self._widget.optTransformUnitsDeg.isChecked():
-                        angular_rpy = self.convert_rpy_rad_to_deg(angular_rpy)
-                    self.write_rpy_to_tf_textbox([*angular_rpy])
-                    self._widget.txtTransformAngularR.setPlainText(str(round(angular_rpy[0], 2)))
-                    self._widget.txtTransformAngularP.setPlainText(str(round(angular_rpy[1], 2)))
-                    self._widget.txtTransformAngularY.setPlainText(str(round(angular_rpy[2], 2)))
-                    self.fix_displayed_text()
+                    angular_rpy = Rotation.from_quat(angular_q).as_euler('xyz',\
+                                  degrees=self._widget.optTransformUnitsDeg.isChecked())
+                    # update all transform textboxes at once: no repaint per textbox
+                    self._widget.setUpdatesEnabled(False)
+                    try:
+                        self.write_linear_to_tf_textbox([selected_grasp.position.x,\
+                                                         selected_grasp.position.y,\
+                                                         selected_grasp.position.z])
+                        self.write_q_to_tf_textbox(angular_q)
+                        self.write_rpy_to_tf_textbox(angular_rpy)
+                    finally:
+                        self._widget.setUpdatesEnabled(True)
 
     def update_grasp_number_label(self):
         self._widget.lblGraspSGrasps.setText(str(self.grasps.size()))
@@ -395,20 +447,15 @@ class RqtGrasplan(Plugin):
         if self.grasps.size() == 0:
             self.log_error("Can't create pattern, grasps are empty")
             return
-        replace = None
-        if self._widget.optEditGHandlingCopyR.isChecked():
-            replace = True
-        else:
-            replace = False
+        # read the pattern settings once
+        replace = self._widget.optEditGHandlingCopyR.isChecked()
+        # axes around which the pattern rotates the grasps: x (roll), y (pitch), z (yaw)
+        axes = np.array([self._widget.chkEditGAxisX.isChecked(),\
+                         self._widget.chkEditGAxisY.isChecked(),\
+                         self._widget.chkEditGAxisZ.isChecked()], dtype=np.float64)
         # mirror: rotate quaternion by 180 degrees in each desired axis
         if self._widget.optEditGPatternMirror.isChecked():
-            roll, pitch, yaw = 0.0, 0.0, 0.0
-            if self._widget.chkEditGAxisX.isChecked():
-                roll = math.pi
-            if self._widget.chkEditGAxisY.isChecked():
-                pitch = math.pi
-            if self._widget.chkEditGAxisZ.isChecked():
-                yaw = math.pi
+            roll, pitch, yaw = (axes * math.pi).tolist()
             if not self.grasps.rotate_selected_grasps(roll, pitch, yaw, replace=replace):
                 self.log_error('Failed to apply pattern, have you selected a grasp or grasps first?')
         # circular pattern
@@ -424,19 +471,10 @@ class RqtGrasplan(Plugin):
             if number_of_grasps < 2:
                 self.log_error('Number of grasps to make pattern must be greater than 1')
                 return
-            roll, pitch, yaw = 0.0, 0.0, 0.0
-            grasps = self.grasps.get_selected_grasps()
-            if len(grasps) == 0:
+            roll_step, pitch_step, yaw_step = (axes * ang_step).tolist()
+            if not self.grasps.rotate_selected_grasps_pattern(roll_step, pitch_step, yaw_step, number_of_grasps, replace=replace):
                 self.log_error("Can't create pattern, no grasps are selected")
                 return
-            for pattern_grasp in range(number_of_grasps - 1):
-                if self._widget.chkEditGAxisX.isChecked():
-                    roll += ang_step
-                if self._widget.chkEditGAxisY.isChecked():
-                    pitch += ang_step
-                if self._widget.chkEditGAxisZ.isChecked():
-                    yaw += ang_step
-                self.grasps.rotate_grasps(grasps, roll, pitch, yaw, replace=replace)
         if self._widget.chkGraspSAllGrasps.isChecked():
             self.grasps.select_all_grasps()
         else:
@@ -459,23 +497,19 @@ class RqtGrasplan(Plugin):
         self.publish_grasps()
 
     def read_transform(self, apply_rpy_to_q=False):
-        linear = [float(self._widget.txtTransformLinearX.toPlainText()),\
-            float(self._widget.txtTransformLinearY.toPlainText()),\
-            float(self._widget.txtTransformLinearZ.toPlainText())]
-        angular_rpy = [float(self._widget.txtTransformAngularR.toPlainText()),\
-            float(self._widget.txtTransformAngularP.toPlainText()),\
-            float(self._widget.txtTransformAngularY.toPlainText())]
-        angular_q = [float(self._widget.txtTransformAngularQx.toPlainText()),\
-            float(self._widget.txtTransformAngularQy.toPlainText()),\
-            float(self._widget.txtTransformAngularQz.toPlainText()),\
-            float(self._widget.txtTransformAngularQw.toPlainText())]
+        # read all transform textboxes in one sweep: linear (0:3), rpy (3:6), quaternion (6:10)
+        values = np.array([float(textbox.toPlainText()) for textbox in self.tf_textboxes])
+        linear = values[:3].tolist()
+        angular_rpy = values[3:6]
+        angular_q = values[6:].tolist()
         if self._widget.optTransformUnitsRad.isChecked():
             # rpy values are in radians
-            if angular_rpy[0] > math.pi or angular_rpy[1] > math.pi or angular_rpy[2] > math.pi:
-                rospy.logwarn('radians are selected but value is greater than pi, is this correct?')
+            if np.any(np.abs(angular_rpy) > math.pi):
+                rospy.logwarn('radians are selected but absolute value is greater than pi, is this correct?')
         if self._widget.optTransformUnitsDeg.isChecked():
-            # rpy values are in degrees, convert to radians
-            angular_rpy = self.convert_rpy_deg_to_rad(angular_rpy)
+            # rpy values are in degrees, convert to radians in place
+            angular_rpy *= math.pi / 180.0
+        angular_rpy = angular_rpy.tolist()
         if apply_rpy_to_q:
             angular_q = tf.transformations.quaternion_from_euler(angular_rpy[0], angular_rpy[1], angular_rpy[2])
             self.write_q_to_tf_textbox(angular_q)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+import unittest
+import math
+import numpy as np
+from unittest import mock
+from geometry_msgs.msg import Point
+from grasplan.tools.support_plane_tools import _poisson_disk_2d, _fill_poisson_disk, _fill_poisson_disk_kernel, well_separated, \
+                                              yaw_quaternions, adjust_plane, cached_scene_objects, get_obj_from_planning_scene, \
+                                              gen_place_poses_from_plane
+
+PLANE = [Point(-1.0, 0.5, 0.801), Point(1.1, 0.5, 0.801), Point(1.1, 1.6, 0.801), Point(-1.0, 1.6, 0.801)]
+
+def make_planning_scene():
+    # table with its center at z = 0.4 and an attached object of half height 0.2
+    table = mock.Mock()
+    table.pose.position.z = 0.4
+    attached_object = mock.Mock()
+    attached_object.object.primitives = [mock.Mock(dimensions=[0.1, 0.1, 0.2])]
+    planning_scene = mock.Mock()
+    planning_scene.get_objects.return_value = {'table': table}
+    planning_scene.get_attached_objects.return_value = {'relay': attached_object}
+    return planning_scene
+
+class TestSupportPlaneTools(unittest.TestCase):
+
+    def assert_separated(self, points, min_dist):
+        squared_dists = ((points[:, np.newaxis, :] - points[np.newaxis, :, :]) ** 2).sum(axis=2)
+        np.fill_diagonal(squared_dists, np.inf)
+        self.assertGreater(squared_dists.min(), min_dist ** 2)
+
+    def test_poisson_disk_min_dist(self):
+        points = _poisson_disk_2d(0.0, 1.0, -0.5, 0.5, 0.1, 50)
+        self.assertEqual(points.shape, (50, 2))
+        self.assert_separated(points, 0.1)
+
+    def test_poisson_disk_full_plane(self):
+        # more points requested than fit, the gaps between the darts get filled
+        points = _poisson_disk_2d(0.0, 0.5, 0.0, 0.5, 0.05, 1000)
+        self.assertGreater(len(points), 50)
+        self.assertLess(len(points), 1000)
+        self.assert_separated(points, 0.05)
+
+    def test_poisson_disk_tiny_min_dist(self):
+        # stops after n_target samples, independent of how many would fit
+        points = _poisson_disk_2d(0.0, 2.1, 0.0, 1.1, 0.0001, 10)
+        self.assertEqual(points.shape, (10, 2))
+        self.assert_separated(points, 0.0001)
+
+    def test_fill_poisson_disk_kernel(self):
+        # the numba kernel (here not compiled) gives the same samples as the pure python implementation
+        rng = np.random.default_rng(1)
+        for n_target in [20, 1000]:
+            random_numbers = (rng.uniform((0.0, 0.0), (0.5, 0.5), (30 * n_target, 2)), rng.random(2 * n_target),
+                              rng.uniform(0.05, 0.1, (2 * n_target, 30)), rng.uniform(0.0, 2.0 * math.pi, (2 * n_target, 30)))
+            points = _fill_poisson_disk(0.0, 0.5, 0.0, 0.5, 0.05, n_target, *random_numbers)
+            np.testing.assert_array_equal(_fill_poisson_disk_kernel(0.0, 0.5, 0.0, 0.5, 0.05, n_target, *random_numbers), points)
+            self.assert_separated(points, 0.05)
+
+    def test_poisson_disk_zero_min_dist(self):
+        self.assertEqual(_poisson_disk_2d(0.0, 2.1, 0.0, 1.1, 0.0, 10).shape, (10, 2))
+
+    def test_poisson_disk_within_bounds(self):
+        points = _poisson_disk_2d(1.0, 2.0, 3.0, 3.5, 0.05, 100)
+        self.assertTrue(np.all((points[:, 0] >= 1.0) & (points[:, 0] <= 2.0)))
+        self.assertTrue(np.all((points[:, 1] >= 3.0) & (points[:, 1] <= 3.5)))
+
+    def test_poisson_disk_small_plane(self):
+        # only a few points fit in a plane that is small compared to min dist
+        points = _poisson_disk_2d(0.0, 0.3, 0.0, 0.3, 0.2, 10)
+        self.assertGreater(len(points), 0)
+        self.assertLess(len(points), 10)
+
+    def test_well_separated(self):
+        self.assertTrue(well_separated([(0.0, 0.0), (1.0, 1.0)], 0.5, 0.0, 0.2))
+        self.assertFalse(well_separated([(0.0, 0.0), (1.0, 1.0)], 0.1, 0.0, 0.2))
+        self.assertTrue(well_separated([], 0.1, 0.0, 0.2))
+
+    def test_yaw_quaternions(self):
+        quaternions = yaw_quaternions(- math.pi / 2.0, 0.5)
+        self.assertEqual(quaternions.shape, (7, 4))
+        np.testing.assert_allclose(np.linalg.norm(quaternions, axis=1), 1.0)
+        np.testing.assert_allclose(quaternions[0], [- math.sqrt(0.5), 0.0, 0.0, math.sqrt(0.5)])
+        np.testing.assert_allclose(yaw_quaternions(0.0, 0.5)[1], [0.0, 0.0, math.sin(0.25), math.cos(0.25)])
+
+    def test_adjust_plane(self):
+        plane = adjust_plane([Point(1.0, 2.0, 0.5), Point(0.0, 2.0, 0.5), Point(0.0, 0.0, 0.5), Point(1.0, 0.0, 0.5)],
+                             x_extend=0.1, y_extend=-0.5, x_offset=1.0)
+        self.assertEqual([(p.x, p.y, p.z) for p in plane], [(0.9, 0.5, 0.5), (2.1, 0.5, 0.5), (2.1, 1.5, 0.5), (0.9, 1.5, 0.5)])
+
+    def test_adjust_plane_not_parallel(self):
+        with self.assertRaises(ValueError):
+            adjust_plane([Point(1.0, 2.0, 0.5), Point(0.0, 2.0, 0.5), Point(0.0, 0.0, 0.5), Point(1.0, 0.0, 0.6)])
+
+    def test_cached_scene_objects(self):
+        planning_scene = mock.Mock()
+        planning_scene.get_objects.return_value = {'table': 'table_collision_object'}
+        with cached_scene_objects(planning_scene):
+            for _ in range(3):
+                self.assertEqual(get_obj_from_planning_scene('table', planning_scene), 'table_collision_object')
+        self.assertEqual(planning_scene.get_objects.call_count, 1)
+        # no caching outside of the context
+        get_obj_from_planning_scene('table', planning_scene)
+        self.assertEqual(planning_scene.get_objects.call_count, 2)
+        with self.assertRaises(ValueError):
+            get_obj_from_planning_scene('shelf', planning_scene)
+
+    def test_gen_place_poses_from_plane(self):
+        object_list_msg = gen_place_poses_from_plane('relay', 'table', PLANE, make_planning_scene(), number_of_poses=10, min_dist=0.2)
+        self.assertEqual(len(object_list_msg.objects), 10)
+        self.assertEqual([o.instance_id for o in object_list_msg.objects], list(range(1, 11)))
+        for o in object_list_msg.objects:
+            self.assertEqual(o.class_id, 'relay')
+            self.assertAlmostEqual(o.pose.position.z, 0.2 + 0.8 + 0.001)
+            self.assertTrue(-1.0 <= o.pose.position.x <= 1.1 and 0.5 <= o.pose.position.y <= 1.6)
+        # positions are rounded to 0.1 mm after sampling
+        self.assert_separated(np.array([(o.pose.position.x, o.pose.position.y) for o in object_list_msg.objects]), 0.2 - 0.001)
+
+    def test_gen_place_poses_from_plane_360(self):
+        # above 20 poses each position gets 7 yaw steps
+        object_list_msg = gen_place_poses_from_plane('relay', 'table', PLANE, make_planning_scene(), number_of_poses=25, min_dist=0.1)
+        self.assertEqual(len(object_list_msg.objects), 25 * 7)
+        self.assertEqual([o.instance_id for o in object_list_msg.objects], list(range(1, 25 * 7 + 1)))
+        for i in range(0, 25 * 7, 7):
+            positions = {(o.pose.position.x, o.pose.position.y) for o in object_list_msg.objects[i:i + 7]}
+            self.assertEqual(len(positions), 1)
+
+    def test_gen_place_poses_from_plane_ignore_min_dist(self):
+        # min dist larger than the plane, would only allow a single pose
+        object_list_msg = gen_place_poses_from_plane('relay', 'table', PLANE, make_planning_scene(), number_of_poses=5,
+                                                     min_dist=10.0, ignore_min_dist_list=['table'])
+        self.assertEqual([o.instance_id for o in object_list_msg.objects], [1, 2, 3, 4, 5])
+
+    def test_gen_place_poses_from_plane_zero_min_dist(self):
+        object_list_msg = gen_place_poses_from_plane('relay', 'table', PLANE, make_planning_scene(), number_of_poses=5, min_dist=0.0)
+        self.assertEqual(len(object_list_msg.objects), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,18 +1,35 @@
 #!/usr/bin/env python3
 
-import copy
-import random
+import contextlib
+import functools
+import types
 import rospy
-import tf
 import math
+import numpy as np
 
 from std_msgs.msg import ColorRGBA
-from visualization_msgs.msg import Marker
-from geometry_msgs.msg import Point, Vector3, PointStamped
+from visualization_msgs.msg import Marker, MarkerArray
+from geometry_msgs.msg import Point, Vector3, PointStamped, Pose, Quaternion
 from std_msgs.msg import Header
 from object_pose_msgs.msg import ObjectList, ObjectPose
 from moveit_msgs.msg import CollisionObject, PlanningScene
 from typing import List
+from scipy.spatial.transform import Rotation
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+_rng = np.random.default_rng()
+# largest dense grid of the numba Poisson-disk kernel (16 MB), larger grids use the sparse pure python implementation
+_MAX_GRID_CELLS = 4_000_000
+
+# plane corner indices of the 2 triangles of a plane marker: p0, p1, p2 and p2, p3, p0
+_TRI_IDX = (0, 1, 2, 2, 3, 0)
+
+# id(planning_scene) -> {obj_name: CollisionObject}, only filled within cached_scene_objects
+_scene_object_caches = {}
 
 
 def make_plane_marker_msg(ref_frame, plane):
@@ -21,8 +38,7 @@ def make_plane_marker_msg(ref_frame, plane):
     '''
     assert isinstance(plane, list)
     assert len(plane) == 4
-    for i in range(4):
-        assert isinstance(plane[i], Point)
+    assert all(isinstance(p, Point) for p in plane)
     marker_msg = Marker()
     # marker_msg.lifetime = rospy.Duration(15.0)
     marker_msg.ns = 'support_plane'
@@ -32,28 +48,51 @@ def make_plane_marker_msg(ref_frame, plane):
     marker_msg.pose.orientation.w = 1.0
     marker_msg.header.frame_id = ref_frame
     marker_msg.type = Marker.TRIANGLE_LIST
-    # p0, p1, p2
-    marker_msg.points.append(plane[0])
-    marker_msg.points.append(plane[1])
-    marker_msg.points.append(plane[2])
-    # p2, p3, p0
-    marker_msg.points.append(plane[2])
-    marker_msg.points.append(plane[3])
-    marker_msg.points.append(plane[0])
+    marker_msg.points = [plane[i] for i in _TRI_IDX]
     marker_msg.scale = Vector3(1.0, 1.0, 1.0)
     marker_msg.color = ColorRGBA(1.0, 0.61, 0.16, 1.0) # orange
     return marker_msg
 
+# ohd : objects height dictionary (read only)
+_OHD = types.MappingProxyType({'power_drill_with_grip': 0.2205359935760498,
+                               'klt': 0.14699999809265138,
+                               'multimeter': 0.04206399992108345,
+                               'relay': 0.10436400026082993,
+                               'screwdriver': 0.034412000328302383,
+                               'insole': 0.21,
+                               'bag': 0.34})
+
+# HACK: object specific rotations, insert poses
+_ROLL_BY_CLASS = types.MappingProxyType({'power_drill_with_grip': - math.pi / 2.0, 'insole': -1.54})
+_YAW_STEP_BY_CLASS = types.MappingProxyType({'insole': 3.14159}) # ~ 180 degree, default ~ 30 degree
+# place poses only rotate the power drill
+_PLACE_ROLL_BY_CLASS = types.MappingProxyType({'power_drill_with_grip': - math.pi / 2.0})
+
 def compute_object_height_for_insertion(object_class_tbi, support_obj_class, gap_between_objects=0.02):
-    # ohd : objects height dictionary, object_class_tbi : object class to be inserted
-    ohd = {'power_drill_with_grip': 0.2205359935760498,
-           'klt': 0.14699999809265138,
-           'multimeter': 0.04206399992108345,
-           'relay': 0.10436400026082993,
-           'screwdriver': 0.034412000328302383,
-           'insole': 0.21,
-           'bag': 0.34}
-    return (ohd[support_obj_class] / 2.0) + (ohd[object_class_tbi] / 2.0) + gap_between_objects
+    # object_class_tbi : object class to be inserted
+    return (_OHD[support_obj_class] + _OHD[object_class_tbi]) / 2.0 + gap_between_objects
+
+@functools.lru_cache(maxsize=None)
+def yaw_quaternions(roll, yaw_step, number_of_steps=7):
+    '''
+    read only (number_of_steps, 4) array of [x, y, z, w] quaternions for (roll, 0.0, i * yaw_step)
+    closed form of quaternion_from_euler with pitch = 0, cached as roll and yaw_step only depend on the object class
+    '''
+    half_yaws = np.arange(number_of_steps) * yaw_step / 2.0
+    quaternions = np.empty((number_of_steps, 4))
+    quaternions[:, 0] = math.sin(roll / 2.0) * np.cos(half_yaws)
+    quaternions[:, 1] = math.sin(roll / 2.0) * np.sin(half_yaws)
+    quaternions[:, 2] = math.cos(roll / 2.0) * np.sin(half_yaws)
+    quaternions[:, 3] = math.cos(roll / 2.0) * np.cos(half_yaws)
+    quaternions.flags.writeable = False
+    return quaternions
+
+def make_object_pose_msg(object_class, instance_id, position, orientation):
+    '''
+    build a new ObjectPose msg from a (x, y, z) position and a [x, y, z, w] orientation
+    '''
+    return ObjectPose(class_id=object_class, instance_id=instance_id,
+                      pose=Pose(position=Point(*position), orientation=Quaternion(*orientation)))
 
 def gen_insert_poses_from_obj(object_class, support_object_pose, obj_height, frame_id='map', same_orientation_as_support_obj=False):
     '''
@@ -62,72 +101,172 @@ def gen_insert_poses_from_obj(object_class, support_object_pose, obj_height, fra
     '''
     object_list_msg = ObjectList()
     object_list_msg.header.frame_id = frame_id
-    insert_poses_id = 1
     # only one insert pose for now
-    object_pose_msg = ObjectPose()
-    object_pose_msg.class_id = object_class
-    object_pose_msg.pose.position.x = support_object_pose.pose.position.x
-    object_pose_msg.pose.position.y = support_object_pose.pose.position.y
-    object_pose_msg.pose.position.z = support_object_pose.pose.position.z + obj_height
-    roll = 0.0
-    pitch = 0.0
-    yaw = 0.0
-    # HACK: object specific rotations
-    if object_class == 'power_drill_with_grip':
-        roll = - math.pi / 2.0
-    elif object_class == 'insole':
-        roll = -1.54
-    
+    position = (support_object_pose.pose.position.x, support_object_pose.pose.position.y,
+                support_object_pose.pose.position.z + obj_height)
+    roll = _ROLL_BY_CLASS.get(object_class, 0.0)
+    yaw_step = _YAW_STEP_BY_CLASS.get(object_class, 0.5)
+
     if not same_orientation_as_support_obj:
-        for i in range(7):
-            angular_q = tf.transformations.quaternion_from_euler(roll, pitch, yaw)
-            object_pose_msg.pose.orientation.x = angular_q[0]
-            object_pose_msg.pose.orientation.y = angular_q[1]
-            object_pose_msg.pose.orientation.z = angular_q[2]
-            object_pose_msg.pose.orientation.w = angular_q[3]
-            object_pose_msg.instance_id = insert_poses_id
-            object_list_msg.objects.append(copy.deepcopy(object_pose_msg))
-            insert_poses_id +=1
-            if object_class == 'insole':
-                yaw += 3.14159 # ~ 180 degree
-            else:
-                yaw += 0.5 # ~ 30 degree
+        angular_qs = yaw_quaternions(roll, yaw_step).tolist()
+        object_list_msg.objects = [None] * len(angular_qs)
+        for i, angular_q in enumerate(angular_qs):
+            object_list_msg.objects[i] = make_object_pose_msg(object_class, i + 1, position, angular_q)
     else:
-        object_pose_msg.pose.orientation.x = support_object_pose.pose.orientation.x
-        object_pose_msg.pose.orientation.y = support_object_pose.pose.orientation.y
-        object_pose_msg.pose.orientation.z = support_object_pose.pose.orientation.z
-        object_pose_msg.pose.orientation.w = support_object_pose.pose.orientation.w
-        if object_class == 'insole':
-            object_pose_msg.pose.orientation.x -= 1.54
-        object_pose_msg.instance_id = insert_poses_id
-        object_list_msg.objects.append(copy.deepcopy(object_pose_msg))
-        insert_poses_id +=1
         q = [support_object_pose.pose.orientation.x, support_object_pose.pose.orientation.y,
              support_object_pose.pose.orientation.z, support_object_pose.pose.orientation.w]
-        euler_rot = tf.transformations.euler_from_quaternion(q)
+        euler_rot = Rotation.from_quat(q).as_euler('xyz')
         if object_class == 'insole':
-            q_new = tf.transformations.quaternion_from_euler(-1.54, euler_rot[1], euler_rot[2] + 3.14159) # roll + 90 degree for insole, yaw + 180 degree
+            q_first = [q[0] - 1.54] + q[1:]
+            q_new = Rotation.from_euler('xyz', [-1.54, euler_rot[1], euler_rot[2] + 3.14159]).as_quat().tolist() # roll + 90 degree for insole, yaw + 180 degree
         else:
-            q_new = tf.transformations.quaternion_from_euler(euler_rot[0], euler_rot[1], euler_rot[2] + 3.14159) # yaw + 180 degree
-        object_pose_msg.pose.orientation.x = q_new[0]
-        object_pose_msg.pose.orientation.y = q_new[1]
-        object_pose_msg.pose.orientation.z = q_new[2]
-        object_pose_msg.pose.orientation.w = q_new[3]
-        object_pose_msg.instance_id = insert_poses_id
-        object_list_msg.objects.append(copy.deepcopy(object_pose_msg))
-        insert_poses_id +=1
+            q_first = q
+            q_new = Rotation.from_euler('xyz', [euler_rot[0], euler_rot[1], euler_rot[2] + 3.14159]).as_quat().tolist() # yaw + 180 degree
+        object_list_msg.objects = [make_object_pose_msg(object_class, 1, position, q_first),
+                                   make_object_pose_msg(object_class, 2, position, q_new)]
     return object_list_msg
 
 def well_separated(x_y_list, candidate_x, candidate_y, min_dist=0.2):
-    if len(x_y_list) == 0:
-        return True
-    true_count = 0
-    for p in x_y_list:
-        if math.dist([candidate_x, candidate_y], p) > min_dist:
-            true_count += 1
-    if true_count == len(x_y_list):
+    '''
+    True if the candidate is further than min_dist away from all (x, y) points in x_y_list
+    not used by the place pose sampling anymore (see _poisson_disk_2d), kept as public helper
+    '''
+    min_squared_dist = min_dist * min_dist
+    for x, y in x_y_list:
+        if (candidate_x - x) ** 2 + (candidate_y - y) ** 2 <= min_squared_dist:
+            return False
+    return True
+
+def _fill_poisson_disk(xmin, xmax, ymin, ymax, r, n_target, darts, active_picks, radii, angles):
+    '''
+    pure python implementation of _poisson_disk_2d, returns a (M, 2) array with M <= n_target
+    darts, active_picks, radii and angles are the random numbers drawn beforehand by _poisson_disk_2d
+    '''
+    cell_size = r / math.sqrt(2)
+    grid = {} # (i, j) -> (x, y) of the sample in that cell, sparse so it does not grow with the plane area
+    r_squared = r * r
+    samples = [] # (x, y) tuples
+
+    def add_if_separated(x, y):
+        i, j = int((x - xmin) / cell_size), int((y - ymin) / cell_size)
+        for ni in range(i - 2, i + 3):
+            for nj in range(j - 2, j + 3):
+                neighbor = grid.get((ni, nj))
+                if neighbor is not None and (neighbor[0] - x) ** 2 + (neighbor[1] - y) ** 2 <= r_squared:
+                    return False
+        grid[i, j] = (x, y)
+        samples.append((x, y))
         return True
-    return False
+
+    for x, y in darts.tolist():
+        if add_if_separated(x, y) and len(samples) == n_target:
+            return np.array(samples, dtype=np.float64)
+    active = list(range(len(samples)))
+    for active_pick, step_radii, step_angles in zip(active_picks.tolist(), radii.tolist(), angles.tolist()):
+        if not active or len(samples) == n_target:
+            break
+        active_index = int(active_pick * len(active))
+        sx, sy = samples[active[active_index]]
+        for radius, angle in zip(step_radii, step_angles):
+            cx = sx + radius * math.cos(angle)
+            cy = sy + radius * math.sin(angle)
+            if xmin <= cx <= xmax and ymin <= cy <= ymax and add_if_separated(cx, cy):
+                active.append(len(samples) - 1)
+                break
+        else:
+            # no candidate found around this sample, retire it
+            active[active_index] = active[-1]
+            active.pop()
+    return np.array(samples, dtype=np.float64).reshape(-1, 2)
+
+def _grid_add_if_separated(grid, samples, number_of_samples, x, y, xmin, ymin, cell_size, r_squared):
+    '''
+    store (x, y) as sample number_of_samples if no sample in its 5x5 cell neighborhood is within r, True if stored
+    '''
+    i = int((x - xmin) / cell_size)
+    j = int((y - ymin) / cell_size)
+    for ni in range(max(i - 2, 0), min(i + 3, grid.shape[0])):
+        for nj in range(max(j - 2, 0), min(j + 3, grid.shape[1])):
+            n = grid[ni, nj]
+            if n >= 0 and (samples[n, 0] - x) ** 2 + (samples[n, 1] - y) ** 2 <= r_squared:
+                return False
+    grid[i, j] = number_of_samples
+    samples[number_of_samples, 0] = x
+    samples[number_of_samples, 1] = y
+    return True
+
+def _fill_poisson_disk_kernel(xmin, xmax, ymin, ymax, r, n_target, darts, active_picks, radii, angles):
+    '''
+    same as _fill_poisson_disk but on a dense grid with preallocated arrays and scalar loops only, to be compiled with numba
+    '''
+    cell_size = r / math.sqrt(2.0)
+    grid = np.full((int((xmax - xmin) / cell_size) + 1, int((ymax - ymin) / cell_size) + 1), -1, dtype=np.int32)
+    samples = np.empty((n_target, 2))
+    active = np.empty(n_target, dtype=np.int64)
+    r_squared = r * r
+    number_of_samples = 0
+    for d in range(darts.shape[0]):
+        if number_of_samples == n_target:
+            break
+        if _grid_add_if_separated(grid, samples, number_of_samples, darts[d, 0], darts[d, 1], xmin, ymin, cell_size, r_squared):
+            active[number_of_samples] = number_of_samples
+            number_of_samples += 1
+    number_of_active = number_of_samples
+    for step in range(active_picks.shape[0]):
+        if number_of_active == 0 or number_of_samples == n_target:
+            break
+        active_index = int(active_picks[step] * number_of_active)
+        sx = samples[active[active_index], 0]
+        sy = samples[active[active_index], 1]
+        found = False
+        for c in range(radii.shape[1]):
+            cx = sx + radii[step, c] * math.cos(angles[step, c])
+            cy = sy + radii[step, c] * math.sin(angles[step, c])
+            if xmin <= cx <= xmax and ymin <= cy <= ymax and \
+                    _grid_add_if_separated(grid, samples, number_of_samples, cx, cy, xmin, ymin, cell_size, r_squared):
+                active[number_of_active] = number_of_samples
+                number_of_samples += 1
+                number_of_active += 1
+                found = True
+                break
+        if not found:
+            # no candidate found around this sample, retire it
+            number_of_active -= 1
+            active[active_index] = active[number_of_active]
+    return samples[:number_of_samples]
+
+if numba is not None:
+    # compiled at import with explicit signatures, not lazily within the first place request
+    _grid_add_if_separated = numba.njit(
+        'boolean(int32[:, :], float64[:, :], int64, float64, float64, float64, float64, float64, float64)', cache=True)(_grid_add_if_separated)
+    _fill_poisson_disk_jit = numba.njit(
+        'float64[:, :](float64, float64, float64, float64, float64, int64, float64[:, :], float64[:], float64[:, :], float64[:, :])',
+        cache=True)(_fill_poisson_disk_kernel)
+else:
+    _fill_poisson_disk_jit = None
+
+def _poisson_disk_2d(xmin, xmax, ymin, ymax, r, n_target, k=30):
+    '''
+    Poisson-disk sampling: up to n_target random (x, y) points within the rectangle that are further than r away from each other
+    first k * n_target uniform darts are thrown, which spreads the samples over the whole plane, once the plane gets crowded
+    Bridson's algorithm fills the gaps by trying k annulus candidates around active samples
+    a grid of cell size r/sqrt(2) holds at most one sample per cell, so a candidate is only checked against its 5x5 cell
+    neighborhood, sampling stops as soon as n_target samples are accepted
+    returns a (M, 2) array, M < n_target only if the rectangle is too small
+    uses a numba compiled kernel if numba is available and the grid is not too large
+    '''
+    if r <= 0.0: # no min distance, any point will do
+        return _rng.uniform((xmin, ymin), (xmax, ymax), (n_target, 2))
+    darts = _rng.uniform((xmin, ymin), (xmax, ymax), (k * n_target, 2))
+    # each Bridson step either accepts a new sample or retires one, so 2 * n_target steps are enough
+    active_picks = _rng.random(2 * n_target)
+    radii = _rng.uniform(r, 2.0 * r, (2 * n_target, k))
+    angles = _rng.uniform(0.0, 2.0 * math.pi, (2 * n_target, k))
+    cell_size = r / math.sqrt(2)
+    grid_cells = (int((xmax - xmin) / cell_size) + 1) * (int((ymax - ymin) / cell_size) + 1)
+    if _fill_poisson_disk_jit is not None and grid_cells <= _MAX_GRID_CELLS:
+        return _fill_poisson_disk_jit(xmin, xmax, ymin, ymax, r, n_target, darts, active_picks, radii, angles)
+    return _fill_poisson_disk(xmin, xmax, ymin, ymax, r, n_target, darts, active_picks, radii, angles)
 
 def gen_place_poses_from_plane(object_class: str, support_object:str, plane: List[str], planning_scene: PlanningScene, frame_id:str = "map",
                                 number_of_poses: int = 10, min_dist: float = 0.2, ignore_min_dist_list: List[str] = []):
@@ -139,58 +278,43 @@ def gen_place_poses_from_plane(object_class: str, support_object:str, plane: Lis
         rospy.logwarn(f'number of poses is greater than 100, min_dist will be set to {0.03} instead of desired value of {min_dist}')
     object_list_msg = ObjectList()
     object_list_msg.header.frame_id = frame_id
-    x_y_list = []
+    xmin, xmax = sorted((plane[0].x, plane[1].x))
+    ymin, ymax = sorted((plane[0].y, plane[3].y))
+    if support_object in ignore_min_dist_list:
+        rospy.logwarn(f'ignoring min dist param for object: {object_class}')
+        x_y_points = np.empty((0, 2))
+    else:
+        x_y_points = _poisson_disk_2d(xmin, xmax, ymin, ymax, min_dist, number_of_poses)
+        if len(x_y_points) < number_of_poses:
+            rospy.logwarn(f'Could not generate poses too much separated from each other, min dist : {min_dist}')
+    # fill up with points that do not respect min_dist (if ignored or if the plane is too small)
+    missing = number_of_poses - len(x_y_points)
+    if missing > 0:
+        x_y_points = np.vstack((x_y_points, _rng.uniform((xmin, ymin), (xmax, ymax), (missing, 2))))
+    x_y_points = np.round(x_y_points, 4) # 0.1 mm
+    # same height for all poses, query the planning scene only once
+    candidate_z = attached_obj_height(support_object, planning_scene)
+    roll = _PLACE_ROLL_BY_CLASS.get(object_class, 0.0)
+    pitch = 0.0
+    if number_of_poses > 20:
+        rospy.loginfo('covering 360 angle for each pose')
+        angular_qs = yaw_quaternions(roll, 0.5).tolist() # ~ 30 degree yaw steps
+        object_list_msg.objects = [None] * (number_of_poses * len(angular_qs))
+    else:
+        # one random yaw per pose, all quaternions in one batch
+        yaws = _rng.uniform(0.0, math.pi, number_of_poses)
+        rpys = np.column_stack((np.full(number_of_poses, roll), np.full(number_of_poses, pitch), yaws))
+        random_yaw_qs = Rotation.from_euler('xyz', rpys).as_quat().tolist()
+        object_list_msg.objects = [None] * number_of_poses
     place_poses_id = 1
-    for _ in range(1, number_of_poses + 1):
-        object_pose_msg = ObjectPose()
-        object_pose_msg.class_id = object_class
-        count = 0
-        while 1:
-            candidate_x = round(random.uniform(plane[0].x, plane[1].x), 4)
-            candidate_y = round(random.uniform(plane[0].y, plane[3].y), 4)
-            if support_object in ignore_min_dist_list:
-                rospy.logwarn(f'ignoring min dist param for object: {object_class}')
-                break
-            if well_separated(x_y_list, candidate_x, candidate_y, min_dist=min_dist):
-                break
-            count += 1
-            if count > 50000: # avoid an infinite loop, cap the max attempts
-                rospy.logwarn(f'Could not generate poses too much separated from each other, min dist : {min_dist}')
-                break
-        x_y_list.append([candidate_x, candidate_y])
-
-        object_pose_msg.pose.position.x = candidate_x
-        object_pose_msg.pose.position.y = candidate_y
-
-        object_pose_msg.pose.position.z = attached_obj_height(support_object, planning_scene)
-
-        roll = 0.0
-        pitch = 0.0
-        yaw = round(random.uniform(0.0, math.pi), 4)
-        # HACK: object specific rotations
-        if object_class == 'power_drill_with_grip':
-            roll = - math.pi / 2.0
+    for i, (candidate_x, candidate_y) in enumerate(x_y_points.tolist()):
+        position = (candidate_x, candidate_y, candidate_z)
         if number_of_poses > 20:
-            rospy.loginfo('covering 360 angle for each pose')
-            yaw = 0.0
-            for _ in range(7):
-                angular_q = tf.transformations.quaternion_from_euler(roll, pitch, yaw)
-                object_pose_msg.pose.orientation.x = angular_q[0]
-                object_pose_msg.pose.orientation.y = angular_q[1]
-                object_pose_msg.pose.orientation.z = angular_q[2]
-                object_pose_msg.pose.orientation.w = angular_q[3]
-                object_pose_msg.instance_id = place_poses_id
-                object_list_msg.objects.append(copy.deepcopy(object_pose_msg))
+            for angular_q in angular_qs:
+                object_list_msg.objects[place_poses_id - 1] = make_object_pose_msg(object_class, place_poses_id, position, angular_q)
                 place_poses_id +=1
-                yaw += 0.5 # ~ 30 degree
         else:
-            angular_q = tf.transformations.quaternion_from_euler(roll, pitch, yaw)
-            object_pose_msg.pose.orientation.x = angular_q[0]
-            object_pose_msg.pose.orientation.y = angular_q[1]
-            object_pose_msg.pose.orientation.z = angular_q[2]
-            object_pose_msg.pose.orientation.w = angular_q[3]
-            object_pose_msg.instance_id = place_poses_id
-            object_list_msg.objects.append(copy.deepcopy(object_pose_msg))
+            object_list_msg.objects[place_poses_id - 1] = make_object_pose_msg(object_class, place_poses_id, position, random_yaw_qs[i])
             place_poses_id +=1
     return object_list_msg
 
@@ -228,25 +352,57 @@ def adjust_plane(
     List[Point]
         A list of four points representing the adjusted plane.
     """
-    if not len(set([p.z for p in plane])) <= 1:
+    z = plane[0].z
+    if any(p.z != z for p in plane):
         raise ValueError("Plane is not parallel to the XY plane")
 
-    plane = [Point(p.x + x_offset, p.y + y_offset, p.z) for p in plane]
+    x_y = np.array([[p.x, p.y] for p in plane])
+    min_x, min_y = (x_y.min(axis=0) + (x_offset - x_extend, y_offset - y_extend)).tolist()
+    max_x, max_y = (x_y.max(axis=0) + (x_offset + x_extend, y_offset + y_extend)).tolist()
+
+    return [Point(min_x, min_y, z),
+            Point(max_x, min_y, z),
+            Point(max_x, max_y, z),
+            Point(min_x, max_y, z)]
 
-    min_x, max_x = min(p.x for p in plane), max(p.x for p in plane)
-    min_y, max_y = min(p.y for p in plane), max(p.y for p in plane)
+def visualize_points(points: List[Point], marker_array_publisher: rospy.Publisher) -> None:
+    """
+    Publish points to view them in RViz, all at once as a single POINTS marker
 
-    return [Point(min_x - x_extend, min_y - y_extend, plane[0].z),
-            Point(max_x + x_extend, min_y - y_extend, plane[0].z),
-            Point(max_x + x_extend, max_y + y_extend, plane[0].z),
-            Point(min_x - x_extend, max_y + y_extend, plane[0].z)]
+    marker_array_publisher needs to publish visualization_msgs/MarkerArray msgs
+    """
+    marker_msg = Marker(header=Header(frame_id='map'), ns='points', type=Marker.POINTS, points=list(points),
+                        scale=Vector3(0.05, 0.05, 0.05), color=ColorRGBA(1.0, 0.0, 0.0, 1.0)) # red
+    marker_msg.pose.orientation.w = 1.0
+    marker_array_publisher.publish(MarkerArray(markers=[marker_msg]))
+
+def animate_points(points: List[Point], point_publisher: rospy.Publisher) -> None:
+    """
+    Publish points one after the other every 0.5 seconds to view them in RViz (e.g. to check their order)
 
-def visualize_points(points: List[Point], point_publisher: rospy.Publisher) -> None:
-    """Publish points to view them in RViz"""
+    point_publisher needs to publish geometry_msgs/PointStamped msgs
+    """
     for point in points:
         point_publisher.publish(PointStamped(header=Header(frame_id='map'), point=point))
         rospy.sleep(0.5)
 
+@contextlib.contextmanager
+def cached_scene_objects(planning_scene: PlanningScene):
+    """
+    Within this context each object is retrieved only once from the planning scene by get_obj_from_planning_scene.
+
+    Use it around a group of queries during which the planning scene is not modified,
+    the cache is dropped when leaving the (outermost) context.
+    """
+    if id(planning_scene) in _scene_object_caches: # nested context, keep the outer cache
+        yield
+        return
+    _scene_object_caches[id(planning_scene)] = {}
+    try:
+        yield
+    finally:
+        del _scene_object_caches[id(planning_scene)]
+
 def get_obj_from_planning_scene(obj_name: str, planning_scene: PlanningScene) -> CollisionObject:
     """
     Get a Object from a MoveIt PlanningScene by its name.
@@ -268,9 +424,15 @@ def get_obj_from_planning_scene(obj_name: str, planning_scene: PlanningScene) ->
     ValueError
         If the object with the specified name is not in the planning scene.
     """
-    if obj_name not in planning_scene.get_known_object_names():
+    cache = _scene_object_caches.get(id(planning_scene))
+    if cache is not None and obj_name in cache:
+        return cache[obj_name]
+    objects = planning_scene.get_objects([obj_name])
+    if obj_name not in objects:
         raise ValueError(f"Object '{obj_name}' not in planning scene")
-    return planning_scene.get_objects([obj_name])[obj_name]
+    if cache is not None:
+        cache[obj_name] = objects[obj_name]
+    return objects[obj_name]
 
 # TODO: consider shape_msgs/Plane instead of 4 points
 def obj_to_plane(support_obj: str, planning_scene: PlanningScene, offset: float = 0.001) -> List[Point]:
@@ -298,10 +460,10 @@ def obj_to_plane(support_obj: str, planning_scene: PlanningScene, offset: float
     if len(collision_object.primitives) != 1 or collision_object.primitives[0].type != 1:
         raise ValueError(f"Object '{support_obj}' is not a box")
      
-    rotation_angle = tf.euler_from_quaternion(
+    rotation_angle = Rotation.from_quat(
         [collision_object.pose.orientation.x, collision_object.pose.orientation.y,
         collision_object.pose.orientation.z, collision_object.pose.orientation.w]
-    )
+    ).as_euler('xyz')
 
     # TODO: this should be checked in a central place and not in each function
     if rotation_angle[0] != 0 or rotation_angle[1] != 0:
@@ -312,11 +474,14 @@ def obj_to_plane(support_obj: str, planning_scene: PlanningScene, offset: float
     
     center_point = [collision_object.pose.position.x, collision_object.pose.position.y, collision_object.pose.position.z * 2]
 
-    corner_offsets = [(half_width, half_depth), (-half_width, half_depth), (-half_width, -half_depth), (half_width, -half_depth)]
+    corner_offsets = np.array([(half_width, half_depth), (-half_width, half_depth), (-half_width, -half_depth), (half_width, -half_depth)])
+
+    # rotate the corner offsets around z by the yaw of the object
+    cos_yaw, sin_yaw = math.cos(rotation_angle[2]), math.sin(rotation_angle[2])
+    rotation = np.array([[cos_yaw, -sin_yaw], [sin_yaw, cos_yaw]])
+    corners = corner_offsets @ rotation.T + center_point[:2]
 
-    return [Point(center_point[0] + dx * math.cos(rotation_angle[2]) - dy * math.sin(rotation_angle[2]),
-             center_point[1] + dx * math.sin(rotation_angle[2]) + dy * math.cos(rotation_angle[2]),
-             center_point[2] + offset) for dx, dy in corner_offsets]
+    return [Point(x, y, center_point[2] + offset) for x, y in corners.tolist()]
 
 def attached_obj_height(attached_obj: str, planning_scene: PlanningScene, offset: float = 0.001) -> float:
     """
@@ -354,7 +519,7 @@ if __name__ == '__main__':
     plane_1 = obj_to_plane(support_object)
     # currently the points need to be specified in a specific order (this is a workaround)
     # the animation helps to make sure the order is correct so that the functions can work correctly
-    animate_plane_points(plane_1, point_pub)
+    animate_points(plane_1, point_pub)
     plane_1 = reduce_plane_area(plane_1, -0.2)
     # visualise plane as marker
     marker_msg = make_plane_marker_msg('map', plane_1)